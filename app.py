@@ -1,8 +1,20 @@
 from flask import Flask, jsonify, request
+import logging
 import os
 import fi_money_mcp
 import gemini
 
+logger = logging.getLogger(__name__)
+
+if __name__ != '__main__':
+    # Under gunicorn, send the app's module loggers through gunicorn's error
+    # log so they are emitted at its --log-level (info by default).
+    gunicorn_logger = logging.getLogger('gunicorn.error')
+    if gunicorn_logger.handlers:
+        root_logger = logging.getLogger()
+        root_logger.handlers = gunicorn_logger.handlers
+        root_logger.setLevel(gunicorn_logger.level)
+
 app = Flask(__name__)
 
 @app.route('/api/user/recommendations', methods=['GET'])
@@ -10,14 +22,35 @@ def get_recommendations():
     # In a real application, the user token would be passed in the request
     # headers or body.
     user_token = 'mock-user-token'
+    # ?refresh=true bypasses the in-memory caches.
+    refresh = request.args.get('refresh', '').lower() == 'true'
 
     try:
-        financial_data = fi_money_mcp.get_financial_data(user_token)
-        recommendations = gemini.get_gemini_recommendations(financial_data)
-        return jsonify({'recommendations': recommendations})
+        financial_data = fi_money_mcp.get_financial_data(user_token, refresh=refresh)
+        recommendations_request = gemini.prepare_recommendations(financial_data)
+        # The ETag is derived from the input data rather than the body, so it
+        # is the same whichever gunicorn worker (with its own cache and its
+        # own Gemini wording) serves the request; hence weak. A client can
+        # only hold it from an earlier successful response, so a match is
+        # answered before Gemini is called at all, unless a refresh was asked
+        # for.
+        if_none_match = request.if_none_match
+        if not refresh and not if_none_match.star_tag and if_none_match.contains_weak(recommendations_request.cache_key):
+            response = app.response_class(status=304)
+            response.set_etag(recommendations_request.cache_key, weak=True)
+            return response
+        try:
+            recommendations = gemini.get_gemini_recommendations(recommendations_request, refresh=refresh)
+        except gemini.RecommendationsUnavailable as e:
+            # No ETag, so clients never revalidate a failure as if it were fresh.
+            return jsonify({'recommendations': str(e)})
+        response = jsonify({'recommendations': recommendations})
+        response.set_etag(recommendations_request.cache_key, weak=True)
+        return response
     except Exception as e:
-        print(f"Error: {e}")
+        logger.exception("Error: %s", e)
         return jsonify({'error': 'Failed to get financial recommendations.'}), 500
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
     app.run(debug=True, port=3000)
@@ -1,12 +1,44 @@
 # This module is responsible for interacting with the Fi Money MCP server.
 # NOTE: This is a placeholder implementation. The actual implementation will
 # require the Fi Money MCP API documentation.
+import logging
+import threading
+import time
 
-def get_financial_data(user_token):
+logger = logging.getLogger(__name__)
+
+# How long fetched financial data is reused before Fi Money MCP is asked
+# again. The data is only kept in memory, never persisted.
+CACHE_TTL_SECONDS = 300
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def get_financial_data(user_token, refresh=False):
+  # Serve a recent response for the same user from memory so that repeated
+  # page loads don't each trigger a round trip to Fi Money MCP. refresh skips
+  # the lookup but still stores the freshly fetched data.
+  now = time.monotonic()
+  if not refresh:
+    with _cache_lock:
+      cached = _cache.get(user_token)
+      if cached is not None and cached[0] > now:
+        return cached[1]
+
+  financial_data = _fetch_financial_data(user_token)
+
+  with _cache_lock:
+    # Drop expired entries so tokens that are never seen again don't pile up.
+    for token in [t for t, (expires, _) in _cache.items() if expires <= now]:
+      del _cache[token]
+    _cache[user_token] = (now + CACHE_TTL_SECONDS, financial_data)
+  return financial_data
+
+def _fetch_financial_data(user_token):
   # In a real implementation, this function would make an HTTP request to the
   # Fi Money MCP server to fetch the user's financial data. The user_token
   # would be used to authenticate the request.
-  print('Fetching financial data from Fi Money MCP...')
+  logger.info('Fetching financial data from Fi Money MCP...')
 
   # For now, we'll return some mock data.
   return {
@@ -1,22 +1,133 @@
+import logging
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from string import Template
 
-def get_gemini_recommendations(financial_data):
-    prompt = f"As a financial advisor, analyze this data: {json.dumps(financial_data)}. Provide actionable recommendations."
+logger = logging.getLogger(__name__)
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+
+# User-facing messages carried by RecommendationsUnavailable.
+UNEXPECTED_RESPONSE_TEXT = "Could not generate recommendations."
+GENERATION_ERROR_TEXT = "Error generating recommendations."
+
+RECOMMENDATIONS_PROMPT = Template(
+    "As a financial advisor, analyze this data: $financial_data. Provide actionable recommendations."
+)
+
+# Only the most recent transactions are sent to Gemini; older history adds
+# prompt tokens (and latency) without changing the advice much.
+MAX_PROMPT_TRANSACTIONS = 50
+
+# Identical financial data produces an identical prompt, so the answer from
+# Gemini is reused for this long instead of paying for another generation.
+RECOMMENDATIONS_CACHE_TTL_SECONDS = 3600
+
+# (connect, read) timeouts in seconds. Without them a stalled connection
+# holds a worker thread indefinitely.
+GEMINI_TIMEOUT = (5, 60)
+
+# One pooled session for all Gemini calls so that keep-alive connections are
+# reused instead of paying a new TCP and TLS handshake per request.
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.2)))
+
+_recommendations_cache = {}
+_recommendations_cache_lock = threading.Lock()
+_recommendations_inflight = {}
+
+# The prompt for one set of financial data and the SHA-256 of it, which keys
+# the cache and depends only on the input data.
+RecommendationsRequest = namedtuple('RecommendationsRequest', ['prompt', 'cache_key'])
+
+class RecommendationsUnavailable(Exception):
+    # Raised when Gemini fails; the message is safe to show to the user.
+    pass
+
+def _summarize_financial_data(financial_data):
+    # The real Fi Money MCP ordering isn't documented yet, so sort by the ISO
+    # date before trimming rather than assume the feed is newest first.
+    # Anything other than a list (e.g. a null from the feed) is passed through
+    # untouched, as it was before trimming was added.
+    summary = dict(financial_data)
+    if isinstance(summary.get('transactions'), list):
+        transactions = sorted(summary['transactions'], key=lambda t: t.get('date', ''), reverse=True)
+        summary['transactions'] = transactions[:MAX_PROMPT_TRANSACTIONS]
+    return summary
+
+def _build_prompt(financial_data):
+    # sort_keys makes the prompt, and therefore the cache key, independent of
+    # dict ordering.
+    return RECOMMENDATIONS_PROMPT.substitute(financial_data=json.dumps(_summarize_financial_data(financial_data), sort_keys=True, separators=(',', ':')))
+
+def prepare_recommendations(financial_data):
+    prompt = _build_prompt(financial_data)
+    return RecommendationsRequest(prompt, hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+
+def get_gemini_recommendations(recommendations_request, refresh=False):
+    prompt, cache_key = recommendations_request
+
+    # Concurrent misses for the same prompt share one in-flight Future: the
+    # first caller asks Gemini and every other caller gets the same outcome,
+    # RecommendationsUnavailable included, instead of retrying in turn.
+    # refresh skips the cached answer but still joins a generation that is
+    # already in flight, since that one is fresh anyway.
+    with _recommendations_cache_lock:
+        cached = _recommendations_cache.get(cache_key)
+        if not refresh and cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        future = _recommendations_inflight.get(cache_key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _recommendations_inflight[cache_key] = future
+
+    if not is_leader:
+        return future.result()
+
+    try:
+        recommendations = _generate_recommendations(prompt, cache_key)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(recommendations)
+        return recommendations
+    finally:
+        with _recommendations_cache_lock:
+            if _recommendations_inflight.get(cache_key) is future:
+                del _recommendations_inflight[cache_key]
+
+def _generate_recommendations(prompt, cache_key):
     chat_history = [{"role": "user", "parts": [{"text": prompt}]}]
     payload = {"contents": chat_history}
     api_key = os.environ.get("GEMINI_API_KEY")
-    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
 
     try:
-        response = requests.post(api_url, json=payload)
+        response = _session.post(GEMINI_API_URL, params={"key": api_key}, json=payload, timeout=GEMINI_TIMEOUT)
         result = response.json()
-        if 'candidates' in result and len(result['candidates']) > 0 and 'content' in result['candidates'][0] and 'parts' in result['candidates'][0]['content'] and len(result['candidates'][0]['content']['parts']) > 0:
-            return result['candidates'][0]['content']['parts'][0]['text']
-        else:
-            print("Gemini API response structure unexpected:", result)
-            return "Could not generate recommendations."
+        try:
+            recommendations = result['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError, TypeError):
+            logger.warning("Gemini API response structure unexpected: %s", result)
+            raise RecommendationsUnavailable(UNEXPECTED_RESPONSE_TEXT)
     except Exception as e:
-        print(f"Error calling Gemini API: {e}")
-        return "Error generating recommendations."
+        logger.exception("Error calling Gemini API: %s", e)
+        raise RecommendationsUnavailable(GENERATION_ERROR_TEXT) from e
+
+    # Only successful generations are cached so that a failure is retried on
+    # the next request.
+    now = time.monotonic()
+    with _recommendations_cache_lock:
+        for key in [k for k, (expires, _) in _recommendations_cache.items() if expires <= now]:
+            del _recommendations_cache[key]
+        _recommendations_cache[cache_key] = (now + RECOMMENDATIONS_CACHE_TTL_SECONDS, recommendations)
+    return recommendations
@@ -0,0 +1,8 @@
+# Test helpers that stand in for the Gemini HTTP API.
+
+class GeminiResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return {'candidates': [{'content': {'parts': [{'text': self.text}]}}]}
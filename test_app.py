@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+import requests
+
+import app
+import gemini
+from gemini_stub import GeminiResponse
+
+
+class RecommendationsETagTest(unittest.TestCase):
+    URL = '/api/user/recommendations'
+
+    def setUp(self):
+        gemini._recommendations_cache.clear()
+        gemini._recommendations_inflight.clear()
+        self.client = app.app.test_client()
+
+    def test_etag_is_stable_when_gemini_wording_changes(self):
+        with mock.patch.object(gemini._session, 'post', return_value=GeminiResponse('Save more.')):
+            first = self.client.get(self.URL)
+        # Another worker process has its own cache and gets different text.
+        gemini._recommendations_cache.clear()
+        with mock.patch.object(gemini._session, 'post', return_value=GeminiResponse('Spend less.')):
+            second = self.client.get(self.URL, headers={'If-None-Match': first.headers['ETag']})
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+
+    def test_matching_etag_skips_gemini_on_a_cold_cache(self):
+        with mock.patch.object(gemini._session, 'post', return_value=GeminiResponse('Save more.')):
+            etag = self.client.get(self.URL).headers['ETag']
+        gemini._recommendations_cache.clear()
+        with mock.patch.object(gemini._session, 'post') as post:
+            response = self.client.get(self.URL, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        post.assert_not_called()
+
+    def test_prompt_is_built_once_per_request(self):
+        with mock.patch.object(gemini._session, 'post', return_value=GeminiResponse('Save more.')), \
+                mock.patch.object(gemini, '_build_prompt', wraps=gemini._build_prompt) as build_prompt:
+            self.client.get(self.URL)
+
+        self.assertEqual(build_prompt.call_count, 1)
+
+    def test_refresh_regenerates_despite_cache_and_matching_etag(self):
+        with mock.patch.object(gemini._session, 'post', return_value=GeminiResponse('Save more.')):
+            etag = self.client.get(self.URL).headers['ETag']
+        with mock.patch.object(gemini._session, 'post', return_value=GeminiResponse('Spend less.')) as post:
+            response = self.client.get(self.URL + '?refresh=true', headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'recommendations': 'Spend less.'})
+        self.assertEqual(post.call_count, 1)
+
+    def test_fallback_response_has_no_etag(self):
+        with mock.patch.object(gemini._session, 'post', side_effect=requests.ConnectionError('down')):
+            response = self.client.get(self.URL)
+
+        self.assertEqual(response.get_json(), {'recommendations': gemini.GENERATION_ERROR_TEXT})
+        self.assertNotIn('ETag', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from unittest import mock
+
+import fi_money_mcp
+
+
+class FinancialDataCacheTest(unittest.TestCase):
+    def setUp(self):
+        fi_money_mcp._cache.clear()
+
+    def test_repeat_fetch_is_served_from_cache(self):
+        with mock.patch.object(fi_money_mcp, '_fetch_financial_data', wraps=fi_money_mcp._fetch_financial_data) as fetch:
+            first = fi_money_mcp.get_financial_data('token')
+            second = fi_money_mcp.get_financial_data('token')
+
+        self.assertIs(second, first)
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_refresh_bypasses_cache(self):
+        with mock.patch.object(fi_money_mcp, '_fetch_financial_data', wraps=fi_money_mcp._fetch_financial_data) as fetch:
+            first = fi_money_mcp.get_financial_data('token')
+            refreshed = fi_money_mcp.get_financial_data('token', refresh=True)
+            cached = fi_money_mcp.get_financial_data('token')
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertIsNot(refreshed, first)
+        self.assertIs(cached, refreshed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import threading
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+import requests
+
+import gemini
+from gemini_stub import GeminiResponse
+
+
+class SummarizeFinancialDataTest(unittest.TestCase):
+    def test_keeps_most_recent_transactions(self):
+        transactions = [{'date': '2024-07-%02d' % day} for day in range(1, 31)] * 2
+
+        summary = gemini._summarize_financial_data({'transactions': transactions})
+
+        self.assertEqual(len(summary['transactions']), gemini.MAX_PROMPT_TRANSACTIONS)
+        self.assertEqual(summary['transactions'][0], {'date': '2024-07-30'})
+
+    def test_null_transactions_pass_through(self):
+        summary = gemini._summarize_financial_data({'accounts': [], 'transactions': None})
+
+        self.assertEqual(summary, {'accounts': [], 'transactions': None})
+
+
+class ConcurrentRecommendationsTest(unittest.TestCase):
+    THREADS = 5
+    TIMEOUT = 5
+
+    def setUp(self):
+        gemini._recommendations_cache.clear()
+        gemini._recommendations_inflight.clear()
+        self.calls = 0
+        self.release = threading.Event()
+        self.waiting = threading.Condition()
+        self.waiters = 0
+
+    def _counting_future(self):
+        test = self
+
+        class CountingFuture(Future):
+            def result(self, timeout=None):
+                with test.waiting:
+                    test.waiters += 1
+                    test.waiting.notify_all()
+                return super().result(timeout)
+
+        return CountingFuture
+
+    def _run_concurrently(self, post):
+        results = []
+        def worker():
+            try:
+                results.append(gemini.get_gemini_recommendations(gemini.prepare_recommendations({'accounts': []})))
+            except Exception as e:
+                results.append(e)
+        with mock.patch.object(gemini._session, 'post', side_effect=post), \
+                mock.patch.object(gemini, 'Future', self._counting_future()):
+            threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+            for thread in threads:
+                thread.start()
+            # Hold the leader's Gemini call until every other thread is
+            # blocked on the shared in-flight Future.
+            with self.waiting:
+                all_waiting = self.waiting.wait_for(lambda: self.waiters == self.THREADS - 1, timeout=self.TIMEOUT)
+            self.release.set()
+            for thread in threads:
+                thread.join(timeout=self.TIMEOUT)
+        self.assertTrue(all_waiting)
+        self.assertEqual(len(results), self.THREADS)
+        return results
+
+    def test_concurrent_misses_share_one_successful_call(self):
+        def post(*args, **kwargs):
+            self.calls += 1
+            self.release.wait(self.TIMEOUT)
+            return GeminiResponse('Save more.')
+
+        results = self._run_concurrently(post)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['Save more.'] * self.THREADS)
+        self.assertEqual(gemini._recommendations_inflight, {})
+
+    def test_concurrent_misses_share_one_failed_call(self):
+        def post(*args, **kwargs):
+            self.calls += 1
+            self.release.wait(self.TIMEOUT)
+            raise requests.ConnectionError('Gemini is down')
+
+        results = self._run_concurrently(post)
+
+        self.assertEqual(self.calls, 1)
+        for result in results:
+            self.assertIsInstance(result, gemini.RecommendationsUnavailable)
+            self.assertEqual(str(result), gemini.GENERATION_ERROR_TEXT)
+        self.assertEqual(gemini._recommendations_inflight, {})
+        # Failures are not cached, so the next request tries Gemini again.
+        self.assertEqual(gemini._recommendations_cache, {})
+
+
+if __name__ == '__main__':
+    unittest.main()